@@ -3,11 +3,13 @@
 """
 Created on 2023-10-02 16:00:00
 """
+import os
 from warnings import filterwarnings
-from rich.traceback import install
-from ProtPeptigram.DataProcessor import PeptideDataProcessor
-from ProtPeptigram.viz import ImmunoViz
-install(show_locals=True)  # type: ignore
+
+# Rich tracebacks with locals are slow and memory-hungry, so they are opt-in
+if os.environ.get("PROTPEPTIGRAM_RICH"):
+    from rich.traceback import install
+    install(show_locals=True)  # type: ignore
 
 filterwarnings("ignore")
 """
@@ -16,13 +18,27 @@ Peptigram: peptides distribution across proteins
 A Python package for mapping peptides to source protein and identifying high desnsity window to core prptides across diffrent source protein
 """
 
-# Import main classes and functions
-from ProtPeptigram.DataProcessor import PeptideDataProcessor
-from ProtPeptigram.viz import ImmunoViz
+# Main classes are imported lazily (PEP 562) so that importing the package,
+# e.g. for __version__, does not pull in pandas, BioPython or matplotlib
+_LAZY_IMPORTS = {
+    'PeptideDataProcessor': 'ProtPeptigram.DataProcessor',
+    'ImmunoViz': 'ProtPeptigram.viz',
+}
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        from importlib import import_module
+        value = getattr(import_module(_LAZY_IMPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
 
 #controll for __all__ to limit what is imported when using 'from module import *'
 # __all__ = ['PeptideDataProcessor', 'ImmunoViz']
 
 __version__ = "1.2.0-dev"
 __author__ = "Sanjay Krishna,Prithvi Munday,Chen Li"
-__email__ = "sanjay.sondekoppagopalakrishna@monash.edu"
\ No newline at end of file
+__email__ = "sanjay.sondekoppagopalakrishna@monash.edu"
@@ -23,8 +23,9 @@ extensions = [
     'sphinx.ext.intersphinx', # Link to other project's documentation
     'sphinx_autodoc_typehints',  # Use type hints for documentation
     'myst_parser',            # Parse Markdown files
-    'nbsphinx',               # Include Jupyter notebooks
 ]
+# nbsphinx is not enabled: the docs include no notebooks, and it would
+# execute notebooks on every build
 
 # Add any paths that contain templates here
 templates_path = ['_templates']
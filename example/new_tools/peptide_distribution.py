@@ -1,15 +1,63 @@
 #!/usr/bin/env python3
 # Peptide Distribution Visualization Tool
 # Optimized for compact 2-3 row layout
+#
+# Requires pyahocorasick (pip install pyahocorasick) on top of the
+# ProtPeptigram requirements. Numba (pip install numba) is optional: when
+# installed, mismatch searches use a compiled parallel scan, otherwise they
+# fall back to a slower NumPy implementation with identical results.
 
 import argparse
 import os
+from functools import lru_cache
+import heapq
+import mmap
+import multiprocessing
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+from matplotlib.collections import PatchCollection
 from matplotlib.colors import LinearSegmentedColormap
-from Bio import SeqIO
+from matplotlib.font_manager import FontProperties
 import numpy as np
+import ahocorasick
 from collections import defaultdict
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is optional, fall back to the NumPy scan
+    njit = None
+
+# Set publication quality defaults for matplotlib
+plt.rcParams['svg.fonttype'] = 'none'  # Ensures text remains editable in SVG
+plt.rcParams['pdf.fonttype'] = 42  # Ensures text remains editable in PDF
+plt.rcParams['font.family'] = 'sans-serif'
+plt.rcParams['font.sans-serif'] = ['Arial', 'Helvetica', 'DejaVu Sans']
+plt.rcParams['axes.linewidth'] = 0.5
+plt.rcParams['xtick.major.width'] = 0.5
+plt.rcParams['ytick.major.width'] = 0.5
+
+# Shared font for peptide labels, and the row size past which labels would
+# only overplot each other
+LABEL_FONT = FontProperties(size=8)
+MAX_LABELS_PER_ROW = 50
+
+# Peptide hits on a protein, with 1-based inclusive positions and the index
+# of the matching peptide in the input peptide list
+MATCH_DTYPE = np.dtype([('start', np.int32), ('end', np.int32),
+                        ('mutations', np.int8), ('peptide_id', np.int32)])
+
+def make_matches(starts, ends, mutations, peptide_ids):
+    """Pack match fields into a structured array of MATCH_DTYPE."""
+    matches = np.empty(len(starts), dtype=MATCH_DTYPE)
+    matches['start'] = starts
+    matches['end'] = ends
+    matches['mutations'] = mutations
+    matches['peptide_id'] = peptide_ids
+    return matches
+
+# Joins proteins into a single searchable sequence; never part of a peptide
+PROTEIN_SEPARATOR = b'*'
 
 def parse_args():
     """Parse command line arguments."""
@@ -26,13 +74,39 @@ def parse_args():
     parser.add_argument('--color-by-mutations', action='store_true', help='Color peptides by number of mutations')
     parser.add_argument('--label-peptides', action='store_true', help='Add peptide sequence labels')
     parser.add_argument('--show-legend', action='store_true', help='Show legend (default: hidden)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Number of processes used to render plots (default: all CPUs)')
     return parser.parse_args()
 
 def read_fasta(fasta_file):
-    """Read protein sequences from FASTA file."""
+    """Read protein sequences from FASTA file as bytes, keyed by record ID.
+    
+    The file is memory-mapped and each sequence is sliced straight out of the
+    map with its line breaks removed, without decoding it to a Python string.
+    """
     proteins = {}
-    for record in SeqIO.parse(fasta_file, "fasta"):
-        proteins[record.id] = str(record.seq)
+    with open(fasta_file, 'rb') as f:
+        # Empty files cannot be memory-mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return proteins
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Records start with '>' at the beginning of a line; pos is the
+            # offset of the next record's '>' or of the newline before it
+            pos = 0 if mm[:1] == b'>' else mm.find(b'\n>')
+            while pos != -1:
+                if mm[pos:pos+1] == b'\n':
+                    pos += 1
+                header_end = mm.find(b'\n', pos)
+                if header_end == -1:
+                    header_end = len(mm)
+                next_pos = mm.find(b'\n>', header_end)
+                seq_end = len(mm) if next_pos == -1 else next_pos
+                
+                # First word of the header is the record ID, empty for a bare '>'
+                fields = mm[pos+1:header_end].split()
+                name = fields[0].decode() if fields else ''
+                proteins[name] = mm[header_end+1:seq_end].translate(None, b' \t\r\n')
+                pos = next_pos
     return proteins
 
 def read_peptides(peptides_file):
@@ -40,38 +114,256 @@ def read_peptides(peptides_file):
     with open(peptides_file, 'r') as f:
         return [line.strip() for line in f if line.strip()]
 
-def count_mutations(seq1, seq2):
-    """Count number of mutations between two sequences of equal length."""
-    return sum(a != b for a, b in zip(seq1, seq2))
+# Compact residue codes: the 20 standard amino acids take 0-19, ambiguous or
+# rare residue letters and the separator follow, so every code fits in 5 bits.
+# All other bytes get the remaining codes one-to-one, so two sequences
+# compare equal after encoding exactly when their bytes do.
+RESIDUE_ALPHABET = b'ACDEFGHIKLMNPQRSTVWY' + b'BJOUXZ' + PROTEIN_SEPARATOR
+RESIDUE_CODES = np.empty(256, dtype=np.uint8)
+RESIDUE_CODES[np.frombuffer(RESIDUE_ALPHABET + bytes(sorted(set(range(256)) - set(RESIDUE_ALPHABET))),
+                            dtype=np.uint8)] = np.arange(256)
 
-def find_peptide_positions(peptide, protein_seq, mutations_allowed=0):
-    """Find positions of a peptide in a protein sequence, allowing for mutations."""
-    positions = []
+def encode_sequence(seq):
+    """Encode a sequence (bytes or str) as a uint8 array of compact residue codes."""
+    if isinstance(seq, str):
+        seq = seq.encode('utf-8')
+    return RESIDUE_CODES[np.frombuffer(seq, dtype=np.uint8)]
+
+@lru_cache(maxsize=None)
+def make_mutation_counter(length, limit):
+    """Generate a mutation counter specialised for one sequence length and limit.
+    
+    The counter takes two sequences of `length` residues and returns the number
+    of mismatches. Counts are exact up to `limit`; above it counting may stop
+    early, so they are only guaranteed to be greater than `limit`.
+    
+    The comparison is fully unrolled into a few summed expressions, checking
+    the limit between pairs of residues once it can be exceeded, so there is
+    no per-residue loop overhead. Peptide sets have only a handful of distinct
+    lengths, so few counters are built.
+    """
+    def mismatches(positions):
+        return " + ".join(f"(seq1[{i}] != seq2[{i}])" for i in positions)
+    
+    # No check is needed until more than `limit` residues have been compared
+    head = min(length, limit + 1)
+    lines = ["def count(seq1, seq2):", f"    c = {mismatches(range(head)) or 0}"]
+    for i in range(head, length, 2):
+        lines.append(f"    if c > {limit}: return c")
+        lines.append(f"    c += {mismatches(range(i, min(i + 2, length)))}")
+    lines.append("    return c")
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return namespace['count']
+
+# SWAR constants for counting non-zero bytes within a 64-bit word
+_LOW_BITS = np.uint64(0x0101010101010101)
+
+def _pack_word(seq_arr):
+    """Pack up to 8 encoded residues into a single uint64 word, zero padded."""
+    word = np.zeros(8, dtype=np.uint8)
+    word[:len(seq_arr)] = seq_arr
+    return word.view(np.uint64)[0]
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def _hamming_scan_jit(peptide_arr, protein_arr, limit):
+        """Compiled Hamming scan, parallel across protein windows."""
+        peptide_len = len(peptide_arr)
+        counts = np.empty(len(protein_arr) - peptide_len + 1, dtype=np.int64)
+        for i in prange(len(counts)):
+            c = 0
+            for j in range(peptide_len):
+                c += protein_arr[i+j] != peptide_arr[j]
+                if c > limit:
+                    break
+            counts[i] = c
+        return counts
+else:
+    _hamming_scan_jit = None
+
+def hamming_scan(peptide_arr, protein_arr, limit=None):
+    """Count mutations between an encoded peptide and every window of an encoded protein.
+    
+    Counts are only guaranteed exact up to `limit`; windows beyond it may stop
+    counting early.
+    """
+    if _hamming_scan_jit is not None:
+        return _hamming_scan_jit(peptide_arr, protein_arr, len(peptide_arr) if limit is None else limit)
+    
+    peptide_len = len(peptide_arr)
+    n_windows = len(protein_arr) - peptide_len + 1
+    
+    if peptide_len > 8:
+        windows = sliding_window_view(protein_arr, peptide_len)
+        return np.count_nonzero(windows != peptide_arr, axis=1)
+    
+    # Short peptides fit in one 64-bit word: XOR each 8-byte window with the
+    # packed peptide and count differing bytes branch-free (SWAR)
+    padded = np.concatenate([protein_arr, np.zeros(8 - peptide_len, dtype=np.uint8)])
+    words = sliding_window_view(padded, 8)[:n_windows].view(np.uint64).ravel()
+    diff = (words ^ _pack_word(peptide_arr)) & _pack_word(np.full(peptide_len, 0xFF, dtype=np.uint8))
+    diff |= diff >> np.uint64(4)
+    diff |= diff >> np.uint64(2)
+    diff |= diff >> np.uint64(1)
+    diff &= _LOW_BITS
+    return (diff * _LOW_BITS) >> np.uint64(56)
+
+def find_peptide_positions(peptide, protein_seq, mutations_allowed=0, peptide_id=0, protein_arr=None):
+    """Find positions of a peptide in a protein sequence, allowing for mutations.
+    
+    Pass the encoded protein as `protein_arr` to avoid re-encoding it per peptide.
+    """
     peptide_len = len(peptide)
     
     # Skip if peptide is longer than protein
     if peptide_len > len(protein_seq):
-        return positions
+        return np.empty(0, dtype=MATCH_DTYPE)
     
-    # Search for matches with allowed mutations
-    for i in range(len(protein_seq) - peptide_len + 1):
-        substring = protein_seq[i:i+peptide_len]
-        mutations = count_mutations(peptide, substring)
+    # Score every window in one vectorized pass
+    if protein_arr is None:
+        protein_arr = encode_sequence(protein_seq)
+    mutation_counts = hamming_scan(encode_sequence(peptide), protein_arr, mutations_allowed)
+    
+    # Search for matches with allowed mutations, recording 1-based positions
+    # for consistency with common notation
+    hits = np.flatnonzero(mutation_counts <= mutations_allowed)
+    return make_matches(hits + 1, hits + peptide_len, mutation_counts[hits], peptide_id)
+
+def build_automaton(peptides):
+    """Build an Aho-Corasick automaton over all peptides for exact matching."""
+    automaton = ahocorasick.Automaton()
+    for idx, peptide in enumerate(peptides):
+        automaton.add_word(peptide, (idx, peptide))
+    automaton.make_automaton()
+    return automaton
+
+def find_exact_matches(automaton, protein_seq):
+    """Find exact positions of all peptides in a protein with a single automaton pass."""
+    starts = []
+    ends = []
+    peptide_ids = []
+    # Without any peptides the automaton is never built and cannot be iterated
+    if automaton.kind == ahocorasick.EMPTY:
+        return make_matches(starts, ends, 0, peptide_ids)
+    for end_idx, (idx, peptide) in automaton.iter(protein_seq):
+        # Record 1-based positions for consistency with common notation
+        starts.append(end_idx - len(peptide) + 2)
+        ends.append(end_idx + 1)
+        peptide_ids.append(idx)
+    return make_matches(starts, ends, 0, peptide_ids)
+
+def build_seed_index(peptides, mutations_allowed):
+    """Index disjoint k-mer seeds of each peptide for seed-and-extend searching.
+    
+    By the pigeonhole principle a match with at most `mutations_allowed`
+    mutations contains at least one of the peptide's `mutations_allowed + 1`
+    disjoint k-mers exactly. Peptides too short to give seeds of at least
+    3 residues are returned separately for an exhaustive scan.
+    """
+    seed_index = defaultdict(lambda: defaultdict(list))
+    unseeded = []
+    for idx, peptide in enumerate(peptides):
+        k = len(peptide) // (mutations_allowed + 1)
+        if k < 3:
+            unseeded.append(idx)
+            continue
+        for offset in range(0, k * (mutations_allowed + 1), k):
+            seed_index[k][peptide[offset:offset+k]].append((idx, offset))
+    return seed_index, unseeded
+
+def find_seeded_matches(seed_index, peptides, protein_seq, mutations_allowed):
+    """Find peptide matches by extending exact k-mer seed hits in a protein."""
+    candidates = set()
+    for k, seeds in seed_index.items():
+        for i in range(len(protein_seq) - k + 1):
+            for idx, offset in seeds.get(protein_seq[i:i+k], ()):
+                start = i - offset
+                if 0 <= start <= len(protein_seq) - len(peptides[idx]):
+                    candidates.add((idx, start))
+    
+    # One unrolled counter per distinct peptide length
+    counters = [make_mutation_counter(len(peptide), mutations_allowed) for peptide in peptides]
+    
+    starts = []
+    ends = []
+    mutation_counts = []
+    peptide_ids = []
+    for idx, start in candidates:
+        end = start + len(peptides[idx])
+        mutations = counters[idx](peptides[idx], protein_seq[start:end])
         
         if mutations <= mutations_allowed:
-            # Record 1-based positions for consistency with common notation
-            positions.append({
-                'start': i + 1,
-                'end': i + peptide_len,
-                'mutations': mutations,
-                'sequence': substring
-            })
-    
-    return positions
+            starts.append(start + 1)
+            ends.append(end)
+            mutation_counts.append(mutations)
+            peptide_ids.append(idx)
+    return make_matches(starts, ends, mutation_counts, peptide_ids)
+
+def split_matches(matches, protein_names, protein_starts, protein_lengths):
+    """Map matches in the concatenated proteome back to per-protein positions.
+    
+    Matches spanning the separator between two proteins are dropped.
+    """
+    per_protein = defaultdict(lambda: np.empty(0, dtype=MATCH_DTYPE))
+    
+    owners = np.searchsorted(protein_starts, matches['start'] - 1, side='right') - 1
+    offsets = protein_starts[owners]
+    inside = matches['end'] - offsets <= np.asarray(protein_lengths)[owners]
+    matches, owners, offsets = matches[inside], owners[inside], offsets[inside]
+    matches['start'] -= offsets
+    matches['end'] -= offsets
+    
+    # Group by owning protein with one stable sort
+    order = np.argsort(owners, kind='stable')
+    matches, owners = matches[order], owners[order]
+    bounds = np.flatnonzero(np.diff(owners)) + 1
+    for group in np.split(np.arange(len(matches)), bounds):
+        if len(group):
+            per_protein[protein_names[owners[group[0]]]] = matches[group]
+    return per_protein
 
-def create_plot(protein_name, protein_seq, peptide_matches, args):
-    """Create a visualization of peptide distribution across a protein."""
-    fig, ax = plt.figure(figsize=(args.width, args.height)), plt.gca()
+def assign_rows(starts, ends, max_rows):
+    """Assign matches sorted by start to plot rows, returning the row of each.
+    
+    Each peptide goes in the lowest row with room for it, otherwise in the row
+    that ends earliest. Occupied rows sit in a min-heap of (end position, row)
+    and rows with room in a min-heap of row indices; as starts only grow, a
+    row that has room stays free for every later peptide.
+    """
+    match_rows = np.empty(len(starts), dtype=np.int8)
+    busy_rows = [(0, row_idx) for row_idx in range(max_rows)]
+    free_rows = []
+    
+    # Assign peptides to rows in a single sweep
+    for i, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        start_pos = start - 1  # Convert to 0-based for plotting
+        end_pos = end - 1
+        
+        # Free rows with enough space for this peptide, adding a small gap between peptides
+        while busy_rows and start_pos > busy_rows[0][0] + 10:
+            heapq.heappush(free_rows, heapq.heappop(busy_rows)[1])
+        
+        if free_rows:
+            # Use the lowest free row
+            row_idx = heapq.heappop(free_rows)
+            heapq.heappush(busy_rows, (end_pos, row_idx))
+        else:
+            # If all rows are occupied at this position, use the row with the earliest ending position
+            row_end, row_idx = busy_rows[0]
+            heapq.heapreplace(busy_rows, (max(row_end, end_pos), row_idx))
+        match_rows[i] = row_idx
+    return match_rows
+
+def create_plot(protein_name, protein_seq, peptide_matches, peptide_labels, args, ax):
+    """Draw the peptide distribution across a protein onto a reusable axes.
+    
+    `peptide_labels` maps the peptide_id of each match to its sequence.
+    """
+    fig = ax.figure
+    
+    # Wipe the previous protein's artists, keeping the figure itself
+    ax.clear()
     
     protein_length = len(protein_seq)
     max_peptides = len(peptide_matches)
@@ -101,9 +393,7 @@ def create_plot(protein_name, protein_seq, peptide_matches, args):
                               linewidth=0.5, zorder=1))
     
     # Add protein position markers
-    tick_positions = list(range(0, protein_length+1, max(1, protein_length // 10)))
-    ax.set_xticks(tick_positions)
-    ax.set_xticklabels([str(pos) for pos in tick_positions], fontsize=9)
+    ax.set_xticks(range(0, protein_length+1, max(1, protein_length // 10)))
     ax.tick_params(axis='x', which='both', width=0.5, length=3, pad=2, colors='#333333')
     
     # Eliminate the gap between axis and bars
@@ -113,66 +403,59 @@ def create_plot(protein_name, protein_seq, peptide_matches, args):
     # Maximum number of rows to use (2 rows as shown in example)
     max_rows = 2
     
-    # Organize peptides into rows with minimal overlap
-    rows = [[] for _ in range(max_rows)]
-    row_end_positions = [0] * max_rows
-    
     # Sort matches by start position first, then by length (shorter first)
-    # This helps with more efficient packing
-    sorted_matches = sorted(peptide_matches, key=lambda x: (x['start'], x['end'] - x['start']))
+    # This helps with more efficient packing; matches arrive unsorted
+    order = np.lexsort((peptide_matches['end'] - peptide_matches['start'], peptide_matches['start']))
+    sorted_matches = peptide_matches[order]
+    starts = sorted_matches['start']
+    ends = sorted_matches['end']
     
-    # Assign peptides to rows
-    for match in sorted_matches:
-        start_pos = match['start'] - 1  # Convert to 0-based for plotting
-        end_pos = match['end'] - 1
+    # Organize peptides into rows with minimal overlap
+    match_rows = assign_rows(starts, ends, max_rows)
+    
+    # Plot peptides by row - using thinner bars as requested, batched into
+    # a single collection so all bars are drawn in one call
+    peptide_rects = []
+    peptide_colors = []
+    for row_idx in range(max_rows):
+        row_matches = sorted_matches[match_rows == row_idx]
+        y_position = 1.2 + row_idx * 0.7  # Position above the protein track with consistent spacing
         
-        # Find suitable row
-        assigned = False
-        for row_idx in range(max_rows):
-            # Check if there's enough space in this row
-            if start_pos > row_end_positions[row_idx] + 10:  # Add small gap between peptides
-                rows[row_idx].append(match)
-                row_end_positions[row_idx] = end_pos
-                assigned = True
-                break
+        # Use thinner peptide bars (half height) as requested
+        peptide_height = 0.4
         
-        # If all rows are occupied at this position, use the row with the earliest ending position
-        if not assigned:
-            best_row = min(range(max_rows), key=lambda i: row_end_positions[i])
-            rows[best_row].append(match)
-            row_end_positions[best_row] = max(row_end_positions[best_row], end_pos)
-    
-    # Plot peptides by row - using thinner bars as requested
-    for row_idx, row_matches in enumerate(rows):
-        y_position = 1.2 + row_idx * 0.7  # Position above the protein track with consistent spacing
+        start_positions = row_matches['start'] - 1  # Convert to 0-based for plotting
+        peptide_lengths = row_matches['end'] - row_matches['start'] + 1
+        mutations = row_matches['mutations']
         
-        for match in row_matches:
-            start_pos = match['start'] - 1  # Convert to 0-based for plotting
-            peptide_length = match['end'] - match['start'] + 1
-            
-            # Use thinner peptide bars (half height) as requested
-            peptide_height = 0.4
-            
-            # Determine color based on mutations
-            if args.color_by_mutations and args.mutations > 0:
-                color = cmap(match['mutations'] / args.mutations)
-            else:
-                color = exact_match_color if match['mutations'] == 0 else mutation_color
-            
-            # Add peptide rectangle
-            rect = plt.Rectangle((start_pos, y_position), peptide_length, peptide_height,
-                               facecolor=color, edgecolor=color, linewidth=0, zorder=2)
-            ax.add_patch(rect)
-            
-            # Add peptide label if requested
-            if args.label_peptides:
-                label_text = f"{match['peptide']}"
-                if match['mutations'] > 0:
-                    label_text += f" ({match['mutations']} mut)"
-                label_text += f" [{match['start']}-{match['end']}]"
+        # Determine color based on mutations
+        if args.color_by_mutations and args.mutations > 0:
+            colors = list(cmap(mutations / args.mutations))
+        else:
+            colors = [exact_match_color if m == 0 else mutation_color for m in mutations.tolist()]
+        
+        # Queue peptide rectangles
+        peptide_rects.extend(plt.Rectangle((start_pos, y_position), peptide_length, peptide_height)
+                             for start_pos, peptide_length in zip(start_positions.tolist(), peptide_lengths.tolist()))
+        peptide_colors.extend(colors)
+        
+        # Add peptide labels if requested, unless the row is too crowded for
+        # them to be readable
+        if args.label_peptides and len(row_matches) <= MAX_LABELS_PER_ROW:
+            for match in row_matches.tolist():
+                start, end, n_mutations, peptide_id = match
+                label_text = f"{peptide_labels[peptide_id]}"
+                if n_mutations > 0:
+                    label_text += f" ({n_mutations} mut)"
+                label_text += f" [{start}-{end}]"
                 
-                ax.text(start_pos + peptide_length + 5, y_position + (peptide_height/2), 
-                       label_text, fontsize=8, va='center', color='#333333')
+                # Place the label just past the end of the bar
+                ax.annotate(label_text, (end + 5, y_position + (peptide_height/2)),
+                            fontproperties=LABEL_FONT, va='center', color='#333333',
+                            annotation_clip=False)
+    
+    ax.add_collection(PatchCollection(peptide_rects, facecolors=peptide_colors,
+                                      edgecolors=peptide_colors, linewidths=0, zorder=2))
     
     # Set plot limits and labels with no padding after protein end
     ax.set_xlim(0, protein_length)  # Remove gap after protein end
@@ -216,23 +499,73 @@ def create_plot(protein_name, protein_seq, peptide_matches, args):
         ax.legend(handles=legend_patches, loc='upper right', frameon=False, fontsize=9)
     
     # Adjust layout
-    plt.tight_layout()
+    fig.tight_layout()
     
     return fig
 
+def find_matches_by_protein(proteins, peptides, mutations_allowed=0):
+    """Find all peptide matches across a proteome, grouped by protein name."""
+    # Search the whole proteome in one pass over the concatenated sequences,
+    # using a separator that never occurs in a peptide
+    protein_names = list(proteins)
+    protein_lengths = [len(seq) for seq in proteins.values()]
+    protein_starts = np.cumsum([0] + [length + 1 for length in protein_lengths])[:-1]
+    proteome = PROTEIN_SEPARATOR.join(proteins.values())
+    
+    # Peptides are compared as UTF-8 bytes, the encoding the FASTA file is read in
+    peptides = [peptide.encode('utf-8') for peptide in peptides]
+    
+    # Exact matching streams the proteome once through a single automaton,
+    # mismatch searches only verify windows anchored on exact k-mer seeds
+    if mutations_allowed == 0:
+        # The automaton works on str; latin-1 maps each byte to one character
+        matches = find_exact_matches(build_automaton([peptide.decode('latin-1') for peptide in peptides]),
+                                     proteome.decode('latin-1'))
+    else:
+        # Mismatch searches compare bytes against the proteome directly
+        seed_index, unseeded = build_seed_index(peptides, mutations_allowed)
+        matches = find_seeded_matches(seed_index, peptides, proteome, mutations_allowed)
+        
+        # Peptides too short to seed fall back to the exhaustive scan over
+        # the proteome, encoded once for all of them
+        if unseeded:
+            proteome_arr = encode_sequence(proteome)
+            matches = np.concatenate([matches] + [
+                find_peptide_positions(peptides[idx], proteome, mutations_allowed, peptide_id=idx,
+                                       protein_arr=proteome_arr)
+                for idx in unseeded])
+    
+    return split_matches(matches, protein_names, protein_starts, protein_lengths)
+
+# Figure reused by every plot rendered in this process
+_figure = None
+
+def render_and_save(protein_name, protein_seq, peptide_matches, peptide_labels, args):
+    """Render one protein's plot and save it, returning the output path.
+    
+    Runs inside worker processes, so each process lazily creates and then
+    reuses its own figure.
+    """
+    global _figure
+    if _figure is None:
+        _figure = plt.figure(figsize=(args.width, args.height))
+        _figure.add_subplot()
+    
+    create_plot(protein_name, protein_seq, peptide_matches, peptide_labels, args, _figure.axes[0])
+    
+    # Adjust figure to remove external padding
+    _figure.subplots_adjust(left=0.05, right=0.98, top=0.95, bottom=0.1)
+    
+    # Save the figure
+    output_path = os.path.join(args.output, f"{protein_name}_peptide_distribution.{args.format}")
+    _figure.savefig(output_path, dpi=args.dpi, bbox_inches='tight', pad_inches=0.1,
+                    facecolor='white', edgecolor='none', transparent=False)
+    return output_path
+
 def main():
     """Main function to process files and create visualizations."""
     args = parse_args()
     
-    # Set publication quality defaults for matplotlib
-    plt.rcParams['svg.fonttype'] = 'none'  # Ensures text remains editable in SVG
-    plt.rcParams['pdf.fonttype'] = 42  # Ensures text remains editable in PDF
-    plt.rcParams['font.family'] = 'sans-serif'
-    plt.rcParams['font.sans-serif'] = ['Arial', 'Helvetica', 'DejaVu Sans']
-    plt.rcParams['axes.linewidth'] = 0.5
-    plt.rcParams['xtick.major.width'] = 0.5
-    plt.rcParams['ytick.major.width'] = 0.5
-    
     # Create output directory if it doesn't exist
     if not os.path.exists(args.output):
         os.makedirs(args.output)
@@ -244,42 +577,42 @@ def main():
     print(f"Loaded {len(proteins)} proteins and {len(peptides)} peptides")
     print(f"Searching with {args.mutations} mutations allowed")
     
-    # Process each protein
+    matches_by_protein = find_matches_by_protein(proteins, peptides, args.mutations)
+    
+    # Map each peptide to the index of its first occurrence in the list
+    first_index = {}
+    first_ids = np.array([first_index.setdefault(peptide, idx) for idx, peptide in enumerate(peptides)],
+                         dtype=np.int32)
+    
+    # Collect one rendering job per protein with matches
+    jobs = []
     for protein_name, protein_seq in proteins.items():
         print(f"Processing {protein_name} ({len(protein_seq)} aa)")
         
-        # Find all peptide matches
-        all_matches = []
-        
-        for peptide in peptides:
-            matches = find_peptide_positions(peptide, protein_seq, args.mutations)
-            
-            for match in matches:
-                all_matches.append({
-                    'peptide': peptide,
-                    **match
-                })
-        
-        # Sort by start position
-        all_matches.sort(key=lambda x: x['start'])
-        # Remove duplicates
+        # Remove duplicates, e.g. from peptides listed more than once
+        all_matches = matches_by_protein[protein_name]
+        keys = (first_ids[all_matches['peptide_id']].astype(np.int64) << 32) | all_matches['start']
+        all_matches = all_matches[np.sort(np.unique(keys, return_index=True)[1])]
         
         print(f"  Found {len(all_matches)} peptide matches")
         
-        if all_matches:
-            # Create and save visualization
-            fig = create_plot(protein_name, protein_seq, all_matches, args)
-            
-            # Adjust figure to remove external padding
-            plt.subplots_adjust(left=0.05, right=0.98, top=0.95, bottom=0.1)
-            
-            # Save the figure
-            output_path = os.path.join(args.output, f"{protein_name}_peptide_distribution.{args.format}")
-            fig.savefig(output_path, dpi=args.dpi, bbox_inches='tight', pad_inches=0.1,
-                       facecolor='white', edgecolor='none', transparent=False)
-            plt.close(fig)
-            
-            print(f"  Saved plot to {output_path}")
+        if len(all_matches):
+            # Ship only this protein's labels, as each job is pickled to a worker
+            peptide_labels = {peptide_id: peptides[peptide_id]
+                              for peptide_id in np.unique(all_matches['peptide_id']).tolist()}
+            jobs.append((protein_name, protein_seq, all_matches, peptide_labels, args))
+    
+    # Plots share no state, so render them concurrently. Workers are spawned
+    # rather than forked, as Numba's thread pool is not fork-safe
+    n_jobs = min(args.jobs, len(jobs))
+    if n_jobs > 1:
+        with multiprocessing.get_context('spawn').Pool(n_jobs) as pool:
+            output_paths = pool.starmap(render_and_save, jobs)
+    else:
+        output_paths = [render_and_save(*job) for job in jobs]
+    
+    for output_path in output_paths:
+        print(f"  Saved plot to {output_path}")
     
     print("Done!")
 
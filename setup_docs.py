@@ -35,7 +35,9 @@ def setup_docs_structure():
     print("\nDocs setup complete. You can now place the documentation files in their respective directories.")
     print("\nTo build the documentation locally, run:")
     print("  cd docs")
-    print("  sphinx-build -b html . _build/html")
+    # Build in parallel and keep the doctree cache used by incremental
+    # rebuilds outside the published HTML output
+    print("  sphinx-build -b html -j auto -d _build/.doctrees . _build/html")
 
 if __name__ == '__main__':
     setup_docs_structure()
\ No newline at end of file
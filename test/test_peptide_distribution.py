@@ -0,0 +1,297 @@
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from unittest import mock
+
+import numpy as np
+from Bio import SeqIO
+
+# The peptide distribution tool is a standalone script under example/new_tools
+SCRIPT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "example", "new_tools")
+sys.path.insert(0, SCRIPT_DIR)
+import peptide_distribution as pdist
+
+
+def brute_force_matches(peptide, protein_seq, mutations_allowed):
+    """Reference search: Hamming-compare the peptide against every window"""
+    matches = []
+    for i in range(len(protein_seq) - len(peptide) + 1):
+        mutations = sum(a != b for a, b in zip(peptide, protein_seq[i:i+len(peptide)]))
+        if mutations <= mutations_allowed:
+            matches.append((i + 1, i + len(peptide), mutations))
+    return matches
+
+
+def as_tuples(matches):
+    """Convert a MATCH_DTYPE array to sorted (start, end, mutations) tuples"""
+    return sorted(zip(matches['start'].tolist(), matches['end'].tolist(),
+                      matches['mutations'].tolist()))
+
+
+def random_sequence(rng, length, alphabet=b"ACDEG"):
+    """Random sequence over a small alphabet, so near matches are frequent"""
+    return bytes(rng.choice(list(alphabet), length).tolist())
+
+
+class TestResidueEncoding(unittest.TestCase):
+    """Test cases for the compact residue encoding"""
+
+    def test_encoding_is_one_to_one(self):
+        """Test that every byte gets its own code"""
+        self.assertEqual(len(set(pdist.RESIDUE_CODES.tolist())), 256)
+        np.testing.assert_array_equal(pdist.encode_sequence(b"ACDEFGHIKLMNPQRSTVWY"), np.arange(20))
+
+    def test_unknown_residues_do_not_match_each_other(self):
+        """Test that distinct residues outside the alphabet count as mutations"""
+        matches = pdist.find_matches_by_protein({"P": b"MMGKxyMM"}, ["GKab"], 1)
+        self.assertEqual(len(matches["P"]), 0)
+
+        matches = pdist.find_matches_by_protein({"P": b"MMGKxyMM"}, ["GKxb"], 1)
+        self.assertEqual(as_tuples(matches["P"]), [(3, 6, 1)])
+
+    def test_encoded_scan_matches_raw_comparison(self):
+        """Test the window scan against a raw comparison on mixed-case input"""
+        protein_seq = b"MKabcDEFxy.-GHabcKLM*ab"
+        for peptide in [b"abc", b"aXc", b"Kab", b"xy.-", b"DEFxy.-G"]:
+            for mutations_allowed in range(3):
+                self.assertEqual(
+                    as_tuples(pdist.find_peptide_positions(peptide, protein_seq, mutations_allowed)),
+                    brute_force_matches(peptide, protein_seq, mutations_allowed))
+
+
+class TestMutationCounter(unittest.TestCase):
+    """Test cases for the generated mutation counters"""
+
+    def test_counter_matches_reference(self):
+        """Test generated counters against a plain count, exact only up to the limit"""
+        rng = np.random.default_rng(0)
+        for length in range(1, 13):
+            for limit in range(4):
+                count = pdist.make_mutation_counter(length, limit)
+                for _ in range(50):
+                    seq1 = bytes(rng.choice(list(b"ACDE"), length).tolist())
+                    seq2 = bytes(rng.choice(list(b"ACDE"), length).tolist())
+                    expected = sum(a != b for a, b in zip(seq1, seq2))
+                    self.assertEqual(count(seq1, seq2) <= limit, expected <= limit)
+                    if expected <= limit:
+                        self.assertEqual(count(seq1, seq2), expected)
+
+
+class TestHammingScan(unittest.TestCase):
+    """Test cases for the vectorized Hamming window scan"""
+
+    def check_scan(self):
+        """Compare hamming_scan with a plain count for peptides on both sides of 8 residues"""
+        rng = np.random.default_rng(2)
+        # Arbitrary bytes, including 0xFF and bytes outside the residue alphabet
+        protein_seq = bytes(rng.integers(0, 256, 60, dtype=np.uint8)) + random_sequence(rng, 200)
+        protein_arr = pdist.encode_sequence(protein_seq)
+        for length in range(1, 13):
+            for _ in range(5):
+                start = int(rng.integers(len(protein_seq) - length + 1))
+                peptide = bytearray(protein_seq[start:start+length])
+                peptide[int(rng.integers(length))] = int(rng.integers(256))
+                expected = np.array([sum(a != b for a, b in zip(peptide, protein_seq[i:i+length]))
+                                     for i in range(len(protein_seq) - length + 1)])
+                for limit in [None, 0, 2]:
+                    with self.subTest(length=length, limit=limit):
+                        counts = pdist.hamming_scan(pdist.encode_sequence(bytes(peptide)), protein_arr, limit)
+                        self.assertEqual(len(counts), len(expected))
+                        cap = length if limit is None else limit
+                        np.testing.assert_array_equal(np.minimum(counts, cap + 1), np.minimum(expected, cap + 1))
+
+    def test_numpy_scan(self):
+        """Test the SWAR (up to 8 residues) and sliding window NumPy scans"""
+        with mock.patch.object(pdist, "_hamming_scan_jit", None):
+            self.check_scan()
+
+    @unittest.skipIf(pdist.njit is None, "numba is not installed")
+    def test_compiled_scan(self):
+        """Test the Numba-compiled scan"""
+        self.check_scan()
+
+    def test_find_peptide_positions(self):
+        """Test window positions and counts, including peptides longer than the protein"""
+        with mock.patch.object(pdist, "_hamming_scan_jit", None):
+            for peptide in [b"ACD", b"ACDEGACDE", b"ACDEGACDEGACDE"]:
+                for mutations_allowed in range(3):
+                    self.assertEqual(
+                        as_tuples(pdist.find_peptide_positions(peptide, b"GACDEGACDEGW", mutations_allowed)),
+                        brute_force_matches(peptide, b"GACDEGACDEGW", mutations_allowed))
+
+
+class TestSeededSearch(unittest.TestCase):
+    """Test cases for the seed-and-extend mismatch search"""
+
+    def test_seeded_search_matches_exhaustive_scan(self):
+        """Test seeded and unseeded peptides against a brute-force scan of each protein"""
+        rng = np.random.default_rng(1)
+        proteins = {f"P{i}": random_sequence(rng, int(rng.integers(1, 120))) for i in range(6)}
+        # Peptides sampled from the proteins, some mutated, with lengths
+        # spanning both the seeded and the unseeded (k < 3) paths
+        peptides = []
+        for _ in range(40):
+            protein_seq = proteins[f"P{rng.integers(6)}"]
+            length = int(rng.integers(1, 16))
+            if length > len(protein_seq):
+                peptides.append(random_sequence(rng, length).decode())
+                continue
+            start = int(rng.integers(len(protein_seq) - length + 1))
+            peptide = bytearray(protein_seq[start:start+length])
+            peptide[int(rng.integers(length))] = ord("W")
+            peptides.append(peptide.decode())
+
+        for mutations_allowed in range(1, 5):
+            seed_index, unseeded = pdist.build_seed_index([p.encode() for p in peptides], mutations_allowed)
+            self.assertTrue(seed_index and unseeded)
+
+            matches = pdist.find_matches_by_protein(proteins, peptides, mutations_allowed)
+            for protein_name, protein_seq in proteins.items():
+                found = matches[protein_name]
+                for idx, peptide in enumerate(peptides):
+                    with self.subTest(mutations_allowed=mutations_allowed, protein=protein_name, peptide=peptide):
+                        self.assertEqual(as_tuples(found[found['peptide_id'] == idx]),
+                                         brute_force_matches(peptide.encode(), protein_seq, mutations_allowed))
+
+
+class TestSplitMatches(unittest.TestCase):
+    """Test cases for mapping concatenated proteome hits back to proteins"""
+
+    def test_matches_across_separator_are_dropped(self):
+        """Test that no match spans two proteins, for every search path"""
+        proteins = {"P1": b"AAACCC", "P2": b"GGGTTT", "P3": b"CC"}
+        # Each peptide only occurs across a protein boundary, where the
+        # separator takes at most one mismatch
+        for peptides, mutations_allowed in [(["CCCGGG", "CCCC"], 0), (["CCCAGGG", "TTAC"], 1),
+                                            (["CCCAGG", "CCAG"], 2)]:
+            with self.subTest(peptides=peptides, mutations_allowed=mutations_allowed):
+                matches = pdist.find_matches_by_protein(proteins, peptides, mutations_allowed)
+                self.assertEqual(sum(len(found) for found in matches.values()), 0)
+
+    def test_local_positions(self):
+        """Test that positions are 1-based within each protein"""
+        proteins = {"P1": b"MKAAA", "P2": b"GMKGG", "P3": b"MK"}
+        for mutations_allowed in range(3):
+            matches = pdist.find_matches_by_protein(proteins, ["MK"], mutations_allowed)
+            for protein_name, protein_seq in proteins.items():
+                self.assertEqual(as_tuples(matches[protein_name]),
+                                 brute_force_matches(b"MK", protein_seq, mutations_allowed))
+
+    def test_no_peptides(self):
+        """Test that an empty peptide list gives no matches, for every search path"""
+        proteins = {"P1": b"MKAAA", "P2": b"GMKGG"}
+        for mutations_allowed in range(3):
+            matches = pdist.find_matches_by_protein(proteins, [], mutations_allowed)
+            for protein_name in proteins:
+                self.assertEqual(len(matches[protein_name]), 0)
+
+    def test_split_matches(self):
+        """Test split_matches directly on hand-placed proteome hits"""
+        # Proteome "ACD*EF*GHIK": proteins start at offsets 0, 4 and 7
+        matches = pdist.make_matches([1, 3, 5, 6, 8, 10], [3, 5, 6, 8, 11, 11], 0, [0, 1, 2, 3, 4, 5])
+        per_protein = pdist.split_matches(matches, ["A", "B", "C"], np.array([0, 4, 7]), [3, 2, 4])
+        self.assertEqual(per_protein["A"][['start', 'end', 'peptide_id']].tolist(), [(1, 3, 0)])
+        self.assertEqual(per_protein["B"][['start', 'end', 'peptide_id']].tolist(), [(1, 2, 2)])
+        self.assertEqual(per_protein["C"][['start', 'end', 'peptide_id']].tolist(), [(1, 4, 4), (3, 4, 5)])
+
+
+def first_fit_rows(starts, ends, max_rows):
+    """Reference row packing: scan every row, as create_plot originally did"""
+    rows = []
+    row_end_positions = [0] * max_rows
+    for start, end in zip(starts, ends):
+        for row_idx in range(max_rows):
+            if start - 1 > row_end_positions[row_idx] + 10:
+                row_end_positions[row_idx] = end - 1
+                break
+        else:
+            row_idx = min(range(max_rows), key=lambda i: row_end_positions[i])
+            row_end_positions[row_idx] = max(row_end_positions[row_idx], end - 1)
+        rows.append(row_idx)
+    return rows
+
+
+class TestAssignRows(unittest.TestCase):
+    """Test cases for packing peptides into plot rows"""
+
+    def test_matches_first_fit(self):
+        """Test the two-heap sweep against the row-by-row first-fit scan"""
+        rng = np.random.default_rng(3)
+        for _ in range(200):
+            n_matches = int(rng.integers(0, 60))
+            starts = np.sort(rng.integers(1, 300, n_matches))
+            ends = starts + rng.integers(0, 40, n_matches)
+            for max_rows in [1, 2, 3, 5]:
+                self.assertEqual(pdist.assign_rows(starts, ends, max_rows).tolist(),
+                                 first_fit_rows(starts.tolist(), ends.tolist(), max_rows))
+
+    def test_lowest_free_row_is_reused(self):
+        """Test that a peptide takes the lowest row with room, not the earliest ending one"""
+        starts = np.array([1, 5, 45])
+        ends = np.array([30, 10, 55])
+        self.assertEqual(pdist.assign_rows(starts, ends, 2).tolist(), [0, 1, 0])
+
+
+class TestReadFasta(unittest.TestCase):
+    """Test cases for the memory-mapped FASTA reader"""
+
+    def setUp(self):
+        """Set up a temporary directory for FASTA files"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up the temporary directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def read(self, content):
+        """Write content to a FASTA file and read it back"""
+        fasta_file = os.path.join(self.temp_dir, "test.fasta")
+        with open(fasta_file, "wb") as f:
+            f.write(content)
+        return pdist.read_fasta(fasta_file)
+
+    def assert_matches_seqio(self, content):
+        """Check that read_fasta agrees with BioPython on the given file content"""
+        proteins = self.read(content)
+        fasta_file = os.path.join(self.temp_dir, "test.fasta")
+        expected = {record.id: str(record.seq).encode() for record in SeqIO.parse(fasta_file, "fasta")}
+        self.assertEqual(proteins, expected)
+
+    def test_regular_records(self):
+        """Test multi-line records with descriptions"""
+        self.assertEqual(self.read(b">sp|P1|A desc\nMKV\nLLA\n>P2\nGGG\n"),
+                         {"sp|P1|A": b"MKVLLA", "P2": b"GGG"})
+
+    def test_edge_cases(self):
+        """Test file layouts that differ from a clean, newline-terminated FASTA"""
+        for content in [
+            b"",                                  # empty file
+            b">P1\r\nMKV\r\nLLA\r\n>P2\r\nGG\r\n",     # CRLF line endings
+            b">P1\nMKV\n>P2\nGG",                # no trailing newline
+            b">P1\n>P2\nGG\n",                   # record without sequence
+            b">P1",                               # header only
+            b">\nMKV\n>P2\nGG\n",                 # bare '>' header
+            b">P1\nMK>V\nL A\tA\n",              # '>' and whitespace inside a sequence line
+        ]:
+            with self.subTest(content=content):
+                self.assert_matches_seqio(content)
+
+
+class TestNonAsciiPeptides(unittest.TestCase):
+    """Test cases for peptides outside the ASCII range"""
+
+    def test_exact_and_mismatch_search(self):
+        """Test that non-ASCII peptides are searched as UTF-8 bytes"""
+        proteins = {"P": "MMGKéMM".encode("utf-8")}
+        matches = pdist.find_matches_by_protein(proteins, ["GKé"], 0)
+        self.assertEqual(as_tuples(matches["P"]), [(3, 6, 0)])
+
+        matches = pdist.find_matches_by_protein(proteins, ["GKéMN"], 1)
+        self.assertEqual(as_tuples(matches["P"]), [(3, 8, 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()